@@ -0,0 +1,873 @@
+import datetime
+import itertools
+import os
+
+import numpy
+import torch
+
+from .abstract_game import AbstractGame
+
+try:
+    from numba import njit
+
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+
+if _HAVE_NUMBA:
+
+    @njit(cache=True, fastmath=True)
+    def _apply_1q_kernel(unitary, gate, out):
+        """
+        Contract a (2, 2) gate into a (m, 2, r) view of the unitary whose
+        middle axis is the target qubit, writing into the preallocated out.
+        """
+        m, _, r = unitary.shape
+        for i in range(m):
+            for j in range(r):
+                x0 = unitary[i, 0, j]
+                x1 = unitary[i, 1, j]
+                out[i, 0, j] = gate[0, 0] * x0 + gate[0, 1] * x1
+                out[i, 1, j] = gate[1, 0] * x0 + gate[1, 1] * x1
+
+    @njit(cache=True, fastmath=True)
+    def _apply_1q_2x2_kernel(unitary, gate, out):
+        """
+        Closed-form gate @ unitary for the 1-qubit system; the eight complex
+        products stay in registers.
+        """
+        out[0, 0] = gate[0, 0] * unitary[0, 0] + gate[0, 1] * unitary[1, 0]
+        out[0, 1] = gate[0, 0] * unitary[0, 1] + gate[0, 1] * unitary[1, 1]
+        out[1, 0] = gate[1, 0] * unitary[0, 0] + gate[1, 1] * unitary[1, 0]
+        out[1, 1] = gate[1, 0] * unitary[0, 1] + gate[1, 1] * unitary[1, 1]
+
+    @njit(cache=True)
+    def _close_kernel(unitary, target, tol2):
+        """
+        Squared-error comparison over the flattened operators, bailing out as
+        soon as the accumulated error exceeds the tolerance (on most rollouts
+        the very first elements already do).
+        """
+        error = 0.0
+        for i in range(unitary.shape[0]):
+            diff = unitary[i] - target[i]
+            error += diff.real * diff.real + diff.imag * diff.imag
+            if error > tol2:
+                return False
+        return True
+
+    @njit(cache=True, fastmath=True)
+    def _apply_2q_kernel(unitary, gate, out):
+        """
+        Contract a (2, 2, 2, 2) gate into a (m, 2, p, 2, r) view of the
+        unitary whose axes 1 and 3 are the target qubits.
+        """
+        m, _, p, _, r = unitary.shape
+        for i in range(m):
+            for j in range(p):
+                for k in range(r):
+                    x00 = unitary[i, 0, j, 0, k]
+                    x01 = unitary[i, 0, j, 1, k]
+                    x10 = unitary[i, 1, j, 0, k]
+                    x11 = unitary[i, 1, j, 1, k]
+                    for a in range(2):
+                        for b in range(2):
+                            out[i, a, j, b, k] = (
+                                gate[a, b, 0, 0] * x00
+                                + gate[a, b, 0, 1] * x01
+                                + gate[a, b, 1, 0] * x10
+                                + gate[a, b, 1, 1] * x11
+                            )
+
+
+def _torch_step_fn(unitary, gate, target, subs, tol2):
+    """
+    Fused gate application + win test on torch tensors; the contraction, the
+    diff and the norm reduction compile into one or two kernels.
+    """
+    new_unitary = torch.einsum(subs, unitary, gate)
+    diff = new_unitary - target
+    won = torch.sum(diff.real ** 2 + diff.imag ** 2) < tol2
+    return new_unitary, won
+
+
+if hasattr(torch, "compile"):
+    _torch_step_fn = torch.compile(
+        _torch_step_fn, mode="reduce-overhead", dynamic=False
+    )
+
+
+PAULI_X = numpy.array([[0, 1], [1, 0]], dtype=complex)
+PAULI_Y = numpy.array([[0, -1j], [1j, 0]], dtype=complex)
+PAULI_Z = numpy.array([[1, 0], [0, -1]], dtype=complex)
+HADAMARD = numpy.array([[1, 1], [1, -1]], dtype=complex) / numpy.sqrt(2)
+PHASE_S = numpy.array([[1, 0], [0, 1j]], dtype=complex)
+T_GATE = numpy.array([[1, 0], [0, numpy.exp(1j * numpy.pi / 4)]], dtype=complex)
+CNOT = numpy.array(
+    [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]], dtype=complex
+).reshape(2, 2, 2, 2)
+
+QB1GATES = [HADAMARD, PHASE_S, T_GATE, PAULI_X, PAULI_Y, PAULI_Z]
+QB1GATE_NAMES = ["H", "S", "T", "X", "Y", "Z"]
+QB2GATES = [CNOT]
+QB2GATE_NAMES = ["CNOT"]
+
+# Default synthesis target, reachable exactly with the gate set above (H T H)
+TARGET_UNITARY = HADAMARD @ T_GATE @ HADAMARD
+
+# Keep the unitary on a CUDA device and replay captured CUDA graphs instead of
+# stepping the NumPy environment (requires a CUDA-capable torch build)
+USE_CUDA_GRAPHS = False
+
+
+# Memoized results of make_full_actions_list, keyed by gate identity (the
+# gate ndarrays are unhashable, and the module-level gate lists are shared by
+# every environment a worker builds)
+_ACTION_LIST_CACHE = {}
+
+
+def make_full_actions_list(q1_gates, q2_gates, nb_qbits):
+    """
+    Enumerate every available action as (index, (gate, qubit(s))).
+
+    1-qubit gates pair with each qubit, 2-qubit gates with each ordered pair
+    of distinct qubits. Results are memoized so the environments spawned by
+    the self-play workers share one list.
+    """
+    key = (
+        tuple(id(gate) for gate in q1_gates),
+        tuple(id(gate) for gate in q2_gates),
+        nb_qbits,
+    )
+    if key not in _ACTION_LIST_CACHE:
+        q1_actions = list(itertools.product(q1_gates, range(nb_qbits)))
+        q2_actions = list(
+            itertools.product(q2_gates, itertools.permutations(range(nb_qbits), 2))
+        )
+        _ACTION_LIST_CACHE[key] = list(enumerate(q1_actions + q2_actions))
+    return _ACTION_LIST_CACHE[key]
+
+
+def make_einsum_subscripts(nb_qbits):
+    """
+    Build the einsum subscript strings contracting a 1q (resp. 2q) gate into
+    the unitary tensor, one per qubit index (resp. ordered qubit pair).
+    """
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    u_subs = letters[: 2 * nb_qbits]
+    fresh = letters[2 * nb_qbits :]
+
+    subs_1q = {}
+    for qbit in range(nb_qbits):
+        axis = 2 * qbit
+        out_subs = u_subs.replace(u_subs[axis], fresh[0])
+        subs_1q[qbit] = f"{u_subs},{fresh[0]}{u_subs[axis]}->{out_subs}"
+
+    subs_2q = {}
+    for qbit_a, qbit_b in itertools.permutations(range(nb_qbits), 2):
+        axis_a, axis_b = 2 * qbit_a, 2 * qbit_b
+        out_subs = u_subs.replace(u_subs[axis_a], fresh[0]).replace(
+            u_subs[axis_b], fresh[1]
+        )
+        subs_2q[(qbit_a, qbit_b)] = (
+            f"{u_subs},{fresh[0]}{fresh[1]}"
+            f"{u_subs[axis_a]}{u_subs[axis_b]}->{out_subs}"
+        )
+
+    return subs_1q, subs_2q
+
+
+def unitary_to_tensor(unitary, nb_qbits):
+    """
+    Reshape a (2**n, 2**n) unitary matrix into the rank-2n tensor layout used
+    by GateSynthesis, with the axes of each qubit interleaved as
+    (out_0, in_0, out_1, in_1, ...).
+    """
+    tensor = unitary.reshape((2,) * (2 * nb_qbits))
+    axes = tuple(
+        itertools.chain.from_iterable((k, nb_qbits + k) for k in range(nb_qbits))
+    )
+    return numpy.transpose(tensor, axes)
+
+
+SIZE = len(make_full_actions_list(QB1GATES, [], 1))
+
+
+class MuZeroConfig:
+    def __init__(self):
+        # More information is available here: https://github.com/werner-duvaud/muzero-general/wiki/Hyperparameter-Optimization
+
+        self.seed = 0  # Seed for numpy, torch and the game
+        self.max_num_gpus = None  # Fix the maximum number of GPUs to use. It's usually faster to use a single GPU (set it to 1) if it has enough memory. None will use every GPUs available
+
+
+
+        ### Game
+        self.observation_shape = (2, 2, 2)  # Dimensions of the game observation, must be 3D (channel, height, width). For a 1D array, please reshape it to (1, 1, length of array)
+        self.action_space = list(range(SIZE))  # Fixed list of all possible actions. You should only edit the length
+        self.players = list(range(1))  # List of players. You should only edit the length
+        self.stacked_observations = 0  # Number of previous observations and previous actions to add to the current observation
+
+        # Evaluate
+        self.muzero_player = 0  # Turn Muzero begins to play (0: MuZero plays first, 1: MuZero plays second)
+        self.opponent = None  # Hard coded agent that MuZero faces to assess his progress in multiplayer games. It doesn't influence training. None, "random" or "expert" if implemented in the Game class
+
+
+
+        ### Self-Play
+        self.num_workers = 1  # Number of simultaneous threads/workers self-playing to feed the replay buffer
+        self.selfplay_on_gpu = False
+        self.max_moves = 20  # Maximum number of moves if game is not finished before
+        self.num_simulations = 50  # Number of future moves self-simulated
+        self.discount = 0.978  # Chronological discount of the reward
+        self.temperature_threshold = None  # Number of moves before dropping the temperature given by visit_softmax_temperature_fn to 0 (ie selecting the best action). If None, visit_softmax_temperature_fn is used every time
+
+        # Root prior exploration noise
+        self.root_dirichlet_alpha = 0.25
+        self.root_exploration_fraction = 0.25
+
+        # UCB formula
+        self.pb_c_base = 19652
+        self.pb_c_init = 1.25
+
+
+
+        ### Network
+        self.network = "fullyconnected"  # "resnet" / "fullyconnected"
+        self.support_size = 10  # Value and reward are scaled (with almost sqrt) and encoded on a vector with a range of -support_size to support_size. Choose it so that support_size <= sqrt(max(abs(discounted reward)))
+
+        # Residual Network
+        self.downsample = False  # Downsample observations before representation network, False / "CNN" (lighter) / "resnet" (See paper appendix Network Architecture)
+        self.blocks = 1  # Number of blocks in the ResNet
+        self.channels = 2  # Number of channels in the ResNet
+        self.reduced_channels_reward = 2  # Number of channels in reward head
+        self.reduced_channels_value = 2  # Number of channels in value head
+        self.reduced_channels_policy = 2  # Number of channels in policy head
+        self.resnet_fc_reward_layers = []  # Define the hidden layers in the reward head of the dynamic network
+        self.resnet_fc_value_layers = []  # Define the hidden layers in the value head of the prediction network
+        self.resnet_fc_policy_layers = []  # Define the hidden layers in the policy head of the prediction network
+
+        # Fully Connected Network
+        self.encoding_size = 16
+        self.fc_representation_layers = []  # Define the hidden layers in the representation network
+        self.fc_dynamics_layers = [16]  # Define the hidden layers in the dynamics network
+        self.fc_reward_layers = [16]  # Define the hidden layers in the reward network
+        self.fc_value_layers = [16]  # Define the hidden layers in the value network
+        self.fc_policy_layers = [16]  # Define the hidden layers in the policy network
+
+
+
+        ### Training
+        self.results_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../results", os.path.basename(__file__)[:-3], datetime.datetime.now().strftime("%Y-%m-%d--%H-%M-%S"))  # Path to store the model weights and TensorBoard logs
+        self.save_model = True  # Save the checkpoint in results_path as model.checkpoint
+        self.training_steps = 30000  # Total number of training steps (ie weights update according to a batch)
+        self.batch_size = 128  # Number of parts of games to train on at each training step
+        self.checkpoint_interval = 10  # Number of training steps before using the model for self-playing
+        self.value_loss_weight = 0.25  # Scale the value loss to avoid overfitting of the value function, paper recommends 0.25 (See paper appendix Reanalyze)
+        self.train_on_gpu = torch.cuda.is_available()  # Train on GPU if available
+
+        self.optimizer = "Adam"  # "Adam" or "SGD". Paper uses SGD
+        self.weight_decay = 1e-4  # L2 weights regularization
+        self.momentum = 0.9  # Used only if optimizer is SGD
+
+        # Exponential learning rate schedule
+        self.lr_init = 0.005  # Initial learning rate
+        self.lr_decay_rate = 1  # Set it to 1 to use a constant learning rate
+        self.lr_decay_steps = 10000
+
+
+
+        ### Replay Buffer
+        self.replay_buffer_size = 3000  # Number of self-play games to keep in the replay buffer
+        self.num_unroll_steps = 10  # Number of game moves to keep for every batch element
+        self.td_steps = 20  # Number of steps in the future to take into account for calculating the target value
+        self.PER = True  # Prioritized Replay (See paper appendix Training), select in priority the elements in the replay buffer which are unexpected for the network
+        self.PER_alpha = 0.5  # How much prioritization is used, 0 corresponding to the uniform case, paper suggests 1
+
+        # Reanalyze (See paper appendix Reanalyse)
+        self.use_last_model_value = True  # Use the last model to provide a fresher, stable n-step value (See paper appendix Reanalyze)
+        self.reanalyse_on_gpu = False
+
+
+
+        ### Adjust the self play / training ratio to avoid over/underfitting
+        self.self_play_delay = 0  # Number of seconds to wait after each played game
+        self.training_delay = 0  # Number of seconds to wait after each training step
+        self.ratio = None  # Desired training steps per self played step ratio. Equivalent to a synchronous version, training can take much longer. Set it to None to disable it
+
+
+    def visit_softmax_temperature_fn(self, trained_steps):
+        """
+        Parameter to alter the visit count distribution to ensure that the action selection becomes greedier as training progresses.
+        The smaller it is, the more likely the best action (ie with the highest visit count) is chosen.
+
+        Returns:
+            Positive float.
+        """
+        if trained_steps < 0.5 * self.training_steps:
+            return 1.0
+        elif trained_steps < 0.75 * self.training_steps:
+            return 0.5
+        else:
+            return 0.25
+
+
+class Game(AbstractGame):
+    """
+    Game wrapper.
+    """
+
+    def __init__(self, seed=None):
+        init_uop = unitary_to_tensor(numpy.eye(2, dtype=complex), 1)
+        target_uop = unitary_to_tensor(TARGET_UNITARY, 1)
+        if USE_CUDA_GRAPHS and torch.cuda.is_available():
+            self.env = CudaGateSynthesis(init_uop, target_uop, QB1GATES, QB2GATES)
+        else:
+            self.env = GateSynthesis(init_uop, target_uop, QB1GATES, QB2GATES)
+
+    def step(self, action):
+        """
+        Apply action to the game.
+
+        Args:
+            action : action of the action_space to take.
+
+        Returns:
+            The new observation, the reward and a boolean if the game has ended.
+        """
+        observation, reward, done = self.env.step(action)
+        # The environment reuses its observation buffer; copy it before it is
+        # stored in the game history
+        return numpy.copy(observation), reward, done
+
+    def legal_actions(self):
+        """
+        Should return the legal actions at each turn, if it is not available, it can return
+        the whole action space. At each turn, the game have to be able to handle one of returned actions.
+
+        For complex game where calculating legal moves is too long, the idea is to define the legal actions
+        equal to the action space but to return a negative reward if the action is illegal.
+
+        Returns:
+            An array of integers, subset of the action space.
+        """
+        return self.env.legal_actions()
+
+    def reset(self):
+        """
+        Reset the game for a new game.
+
+        Returns:
+            Initial observation of the game.
+        """
+        return numpy.copy(self.env.reset())
+
+    def render(self):
+        """
+        Display the game observation.
+        """
+        self.env.render()
+        input("Press enter to take a step ")
+
+    def action_to_string(self, action_number):
+        """
+        Convert an action number to a string representing the action.
+
+        Args:
+            action_number: an integer from the action space.
+
+        Returns:
+            String representing the action.
+        """
+        _, (gate, qbits) = self.env.full_action_list[action_number]
+        if gate.shape == (2, 2):
+            name = QB1GATE_NAMES[next(i for i, g in enumerate(QB1GATES) if g is gate)]
+            return f"Apply {name} on qubit {qbits}"
+        name = QB2GATE_NAMES[next(i for i, g in enumerate(QB2GATES) if g is gate)]
+        return f"Apply {name} on qubits {qbits[0]}, {qbits[1]}"
+
+
+class GateSynthesis:
+    """
+    Environment whose state is the unitary implemented by the circuit built so
+    far, stored as a rank-2n tensor (axes interleaved as out_0, in_0, ...).
+    Each action left-multiplies the state by a gate from the available set.
+    """
+
+    def __init__(
+        self,
+        init_uop,
+        target_uop,
+        q1_gates,
+        q2_gates,
+        tol=1e-3,
+        max_steps=20,
+        final_reward=100,
+        dtype=numpy.complex64,
+    ):
+        # complex64 keeps well over tol digits of precision while halving the
+        # bytes moved per contraction; pass complex128 for tighter targets.
+        # The operators are forced C-contiguous: init_uop is typically a
+        # transposed view from unitary_to_tensor, and the apply paths rely on
+        # reshape returning views of the buffers, not copies
+        self.dtype = dtype
+        self.init_unitary_op = numpy.ascontiguousarray(init_uop.astype(dtype))
+        self.target_unitary_op = numpy.ascontiguousarray(target_uop.astype(dtype))
+        # Ping-pong buffer pair: every gate application reads _buf_a and
+        # writes _buf_b, then the two are swapped, so the whole episode runs
+        # on two allocations paid once here
+        self._buf_a = self.init_unitary_op.copy(order="C")
+        self._buf_b = numpy.empty(self.init_unitary_op.shape, dtype=dtype)
+        assert self._buf_a.flags["C_CONTIGUOUS"] and self._buf_b.flags["C_CONTIGUOUS"]
+        self.curr_unitary_op = self._buf_a
+        self.nb_qbits = init_uop.ndim // 2
+        self.q1_gates = q1_gates
+        self.q2_gates = q2_gates
+        self.tol = tol
+        self.max_steps = max_steps
+        self.final_reward = final_reward
+        self.nb_steps = 0
+        self.full_action_list = self.make_full_action_list()
+        self.make_einsum_tables()
+
+        # Observation scratch: moving the in-axes behind the out-axes depends
+        # only on nb_qbits and the (2, 2**n, 2**n) buffer is refilled in
+        # place every call
+        self._obs_src = tuple(range(1, 2 * self.nb_qbits, 2))
+        self._obs_dst = tuple(range(self.nb_qbits, 2 * self.nb_qbits))
+        self._obs_shape = (2 ** self.nb_qbits, 2 ** self.nb_qbits)
+        self._obs_buf = numpy.empty((2,) + self._obs_shape, dtype=numpy.float32)
+        self._n_actions = len(self.full_action_list)
+        self._legal_actions_cached = list(range(self._n_actions))
+
+    # Structure-of-arrays action tables shared by every instance with the
+    # same gate set (they are read-only), keyed like _ACTION_LIST_CACHE
+    _ACTION_ARRAYS_CACHE = {}
+
+    @classmethod
+    def make_action_arrays(cls, q1_gates, q2_gates, nb_qbits, dtype):
+        key = (
+            tuple(id(gate) for gate in q1_gates),
+            tuple(id(gate) for gate in q2_gates),
+            nb_qbits,
+            numpy.dtype(dtype).str,
+        )
+        if key not in cls._ACTION_ARRAYS_CACHE:
+            full_actions = make_full_actions_list(q1_gates, q2_gates, nb_qbits)
+            nb_1q_actions = len(q1_gates) * nb_qbits
+            q1_actions = [action for _, action in full_actions[:nb_1q_actions]]
+            q2_actions = [action for _, action in full_actions[nb_1q_actions:]]
+
+            gate_array_1q = (
+                numpy.stack([gate for gate, _ in q1_actions]).astype(dtype)
+                if q1_actions
+                else numpy.empty((0, 2, 2), dtype=dtype)
+            )
+            qbit_1q = numpy.array(
+                [qbit for _, qbit in q1_actions], dtype=numpy.intp
+            )
+            gate_array_2q = (
+                numpy.stack([gate for gate, _ in q2_actions]).astype(dtype)
+                if q2_actions
+                else numpy.empty((0, 2, 2, 2, 2), dtype=dtype)
+            )
+            qbit_2q = numpy.array(
+                [qbits for _, qbits in q2_actions], dtype=numpy.intp
+            ).reshape(len(q2_actions), 2)
+            is_2q = numpy.arange(len(full_actions)) >= nb_1q_actions
+            cls._ACTION_ARRAYS_CACHE[key] = (
+                gate_array_1q,
+                qbit_1q,
+                gate_array_2q,
+                qbit_2q,
+                is_2q,
+            )
+        return cls._ACTION_ARRAYS_CACHE[key]
+
+    def make_full_action_list(self):
+        self.nb_1q_actions = len(self.q1_gates) * self.nb_qbits
+        (
+            self._gate_array_1q,
+            self._qbit_1q,
+            self._gate_array_2q,
+            self._qbit_2q,
+            self._is_2q,
+        ) = self.make_action_arrays(
+            self.q1_gates, self.q2_gates, self.nb_qbits, self.dtype
+        )
+        return make_full_actions_list(self.q1_gates, self.q2_gates, self.nb_qbits)
+
+    def make_einsum_tables(self):
+        """
+        Cache one einsum subscript string and one contraction path per qubit
+        pair, so the apply_2q_gate fallback is a single einsum call with a
+        precomputed path instead of tensordot + transpose rebuilt at every
+        step. The 1q fallback is a plain broadcast matmul and needs no table.
+        """
+        _, self._subs_2q = make_einsum_subscripts(self.nb_qbits)
+        dummy_u = numpy.empty_like(self.init_unitary_op)
+
+        self._paths_2q = {}
+        dummy_2q = numpy.empty((2, 2, 2, 2), dtype=self.dtype)
+        for qbits, subs in self._subs_2q.items():
+            path, _ = numpy.einsum_path(subs, dummy_u, dummy_2q, optimize="optimal")
+            self._paths_2q[qbits] = path
+
+    def _swap_buffers(self):
+        self._buf_a, self._buf_b = self._buf_b, self._buf_a
+        self.curr_unitary_op = self._buf_a
+
+    def apply_1q_gate(self, gate, qb_idx):
+        # On a 1-qubit system the state is literally a 2x2 matrix; skip the
+        # generic reshape dispatch entirely
+        if self.nb_qbits == 1:
+            if _HAVE_NUMBA:
+                _apply_1q_2x2_kernel(self._buf_a, gate, self._buf_b)
+            else:
+                numpy.matmul(gate, self._buf_a, out=self._buf_b)
+            self._swap_buffers()
+            return
+
+        # Reshaping the C-contiguous state to (m, 2, r) puts the target qubit
+        # axis in the middle for free, so no transpose bookkeeping is needed
+        axis = 2 * qb_idx
+        shape = (2 ** axis, 2, -1)
+        unitary = self._buf_a.reshape(shape)
+        out = self._buf_b.reshape(shape)
+        if _HAVE_NUMBA:
+            _apply_1q_kernel(unitary, gate, out)
+        else:
+            # (2, 2) gate broadcast against the (m, 2, r) stack in one matmul
+            numpy.matmul(gate, unitary, out=out)
+        self._swap_buffers()
+
+    def apply_2q_gate(self, gate, qb_idx_a, qb_idx_b):
+        if _HAVE_NUMBA:
+            axis_a, axis_b = 2 * qb_idx_a, 2 * qb_idx_b
+            if axis_a > axis_b:
+                axis_a, axis_b = axis_b, axis_a
+                gate = gate.transpose(1, 0, 3, 2)
+            shape = (2 ** axis_a, 2, 2 ** (axis_b - axis_a - 1), 2, -1)
+            _apply_2q_kernel(
+                self._buf_a.reshape(shape), gate, self._buf_b.reshape(shape)
+            )
+        else:
+            numpy.einsum(
+                self._subs_2q[(qb_idx_a, qb_idx_b)],
+                self._buf_a,
+                gate,
+                optimize=self._paths_2q[(qb_idx_a, qb_idx_b)],
+                out=self._buf_b,
+            )
+        self._swap_buffers()
+
+    def step(self, action_idx):
+        self.nb_steps += 1
+        if self._is_2q[action_idx]:
+            idx = action_idx - self.nb_1q_actions
+            qbit_a, qbit_b = self._qbit_2q[idx]
+            self.apply_2q_gate(self._gate_array_2q[idx], qbit_a, qbit_b)
+        else:
+            self.apply_1q_gate(
+                self._gate_array_1q[action_idx], self._qbit_1q[action_idx]
+            )
+
+        won = self.have_winner()
+        done = won or self.nb_steps > self.max_steps
+        reward = self.final_reward if won else 0
+        return self.get_observation(), reward, done
+
+    def get_observation(self):
+        # Returns a buffer reused across calls; callers keeping the
+        # observation around must copy it (Game does)
+        unitary = numpy.moveaxis(
+            self.curr_unitary_op, self._obs_src, self._obs_dst
+        ).reshape(self._obs_shape)
+        numpy.copyto(self._obs_buf[0], unitary.real)
+        numpy.copyto(self._obs_buf[1], unitary.imag)
+        return self._obs_buf
+
+    def legal_actions(self):
+        # Every gate can always be applied; hand back the list built once in
+        # __init__ instead of a fresh range per MCTS node
+        return self._legal_actions_cached
+
+    def have_winner(self):
+        if _HAVE_NUMBA:
+            return _close_kernel(
+                self.curr_unitary_op.reshape(-1),
+                self.target_unitary_op.reshape(-1),
+                self.tol ** 2,
+            )
+        # Squared Frobenius distance through one fused complex dot, instead of
+        # the abs-diff + bool temporaries that numpy.allclose materializes
+        diff = self.curr_unitary_op - self.target_unitary_op
+        return numpy.vdot(diff, diff).real < self.tol ** 2
+
+    def reset(self):
+        numpy.copyto(self._buf_a, self.init_unitary_op)
+        self.curr_unitary_op = self._buf_a
+        self.nb_steps = 0
+        return self.get_observation()
+
+    def render(self):
+        observation = self.get_observation()
+        print("Current unitary (real part):")
+        print(observation[0])
+        print("Current unitary (imaginary part):")
+        print(observation[1])
+        print(
+            "Distance to target:",
+            numpy.abs(self.curr_unitary_op - self.target_unitary_op).max(),
+        )
+
+
+class BatchedGateSynthesis:
+    """
+    Vectorized variant stepping a batch of independent synthesis games at
+    once. The state is a (B, 2, ..., 2) tensor and step takes a vector of B
+    action indices, applying the gates with one einsum per distinct action
+    instead of B Python-level environment steps.
+    """
+
+    def __init__(
+        self,
+        init_uop,
+        target_uop,
+        q1_gates,
+        q2_gates,
+        batch_size,
+        tol=1e-3,
+        max_steps=20,
+        final_reward=100,
+    ):
+        self.batch_size = batch_size
+        self.nb_qbits = init_uop.ndim // 2
+        self.init_unitary_op = init_uop
+        self.target_unitary_op = target_uop
+        self.curr_unitary_op = numpy.broadcast_to(
+            init_uop, (batch_size,) + init_uop.shape
+        ).copy()
+        self.q1_gates = q1_gates
+        self.q2_gates = q2_gates
+        self.tol = tol
+        self.max_steps = max_steps
+        self.final_reward = final_reward
+        # One step counter per game, so partially reset batches terminate on
+        # their own clocks
+        self.nb_steps = numpy.zeros(batch_size, dtype=numpy.intp)
+        self.full_action_list = make_full_actions_list(
+            q1_gates, q2_gates, self.nb_qbits
+        )
+        self.nb_1q_actions = len(q1_gates) * self.nb_qbits
+
+        # Batched subscripts: an ellipsis broadcasts each contraction over the
+        # leading game dimension
+        subs_1q, subs_2q = make_einsum_subscripts(self.nb_qbits)
+        self._subs_1q = {
+            qbit: "..." + subs.replace("->", "->...")
+            for qbit, subs in subs_1q.items()
+        }
+        self._subs_2q = {
+            qbits: "..." + subs.replace("->", "->...")
+            for qbits, subs in subs_2q.items()
+        }
+        self._obs_src = tuple(range(2, 2 * self.nb_qbits + 1, 2))
+        self._obs_dst = tuple(range(self.nb_qbits + 1, 2 * self.nb_qbits + 1))
+
+    def step(self, action_idxs):
+        self.nb_steps += 1
+        action_idxs = numpy.asarray(action_idxs)
+        for action in numpy.unique(action_idxs):
+            selected = action_idxs == action
+            _, (gate, qbits) = self.full_action_list[action]
+            if action < self.nb_1q_actions:
+                subs = self._subs_1q[qbits]
+            else:
+                subs = self._subs_2q[qbits]
+            self.curr_unitary_op[selected] = numpy.einsum(
+                subs, self.curr_unitary_op[selected], gate
+            )
+
+        won = self.have_winner()
+        dones = won | (self.nb_steps > self.max_steps)
+        rewards = numpy.where(won, self.final_reward, 0)
+        return self.get_observation(), rewards, dones
+
+    def get_observation(self):
+        unitary = numpy.moveaxis(
+            self.curr_unitary_op, self._obs_src, self._obs_dst
+        ).reshape(self.batch_size, 2 ** self.nb_qbits, 2 ** self.nb_qbits)
+        return numpy.stack((unitary.real, unitary.imag), axis=1)
+
+    def have_winner(self):
+        diff = (self.curr_unitary_op - self.target_unitary_op).reshape(
+            self.batch_size, -1
+        )
+        errors = numpy.einsum("ni,ni->n", diff, diff.conj()).real
+        return errors < self.tol ** 2
+
+    def reset(self, selected=None):
+        if selected is None:
+            self.curr_unitary_op[:] = self.init_unitary_op
+            self.nb_steps[:] = 0
+        else:
+            self.curr_unitary_op[selected] = self.init_unitary_op
+            self.nb_steps[selected] = 0
+        return self.get_observation()
+
+
+class CudaGateSynthesis:
+    """
+    GateSynthesis variant keeping the unitary as a torch.complex64 tensor on
+    a CUDA device. The gate application + win test sequence is captured once
+    per (gate arity, qubit index) as a CUDA graph; each step copies the chosen
+    gate into the static input tensor and replays the graph, amortizing kernel
+    launch overhead across the MCTS rollouts.
+    """
+
+    def __init__(
+        self,
+        init_uop,
+        target_uop,
+        q1_gates,
+        q2_gates,
+        tol=1e-3,
+        max_steps=20,
+        final_reward=100,
+        device="cuda",
+    ):
+        if not torch.cuda.is_available():
+            raise RuntimeError("CudaGateSynthesis requires a CUDA device")
+        self.device = torch.device(device)
+        self.nb_qbits = init_uop.ndim // 2
+        self.tol = tol
+        self.max_steps = max_steps
+        self.final_reward = final_reward
+        self.nb_steps = 0
+        self.full_action_list = make_full_actions_list(
+            q1_gates, q2_gates, self.nb_qbits
+        )
+        self.nb_1q_actions = len(q1_gates) * self.nb_qbits
+        self._legal_actions_cached = list(range(len(self.full_action_list)))
+
+        self.init_unitary_op = torch.as_tensor(
+            init_uop, dtype=torch.complex64, device=self.device
+        )
+        self.target_unitary_op = torch.as_tensor(
+            target_uop, dtype=torch.complex64, device=self.device
+        )
+        self.curr_unitary_op = self.init_unitary_op.clone()
+
+        self._gate_tensors = [
+            torch.as_tensor(gate, dtype=torch.complex64, device=self.device)
+            for _, (gate, _) in self.full_action_list
+        ]
+        self._obs_axes = tuple(
+            itertools.chain(
+                range(0, 2 * self.nb_qbits, 2), range(1, 2 * self.nb_qbits, 2)
+            )
+        )
+
+        self._subs_1q, self._subs_2q = make_einsum_subscripts(self.nb_qbits)
+        self._gate_in_1q = torch.empty(
+            (2, 2), dtype=torch.complex64, device=self.device
+        )
+        self._gate_in_2q = torch.empty(
+            (2, 2, 2, 2), dtype=torch.complex64, device=self.device
+        )
+        self._win_out = torch.zeros((), dtype=torch.bool, device=self.device)
+        try:
+            self._graphs_1q = {
+                qbit: self._capture(subs, self._gate_in_1q)
+                for qbit, subs in self._subs_1q.items()
+            }
+            self._graphs_2q = {
+                qbits: self._capture(subs, self._gate_in_2q)
+                for qbits, subs in self._subs_2q.items()
+            }
+        except RuntimeError:
+            # Graph capture unsupported on this device/driver; fall back to
+            # the torch.compile'd fused step
+            self._graphs_1q = None
+            self._graphs_2q = None
+
+    def _capture(self, subs, gate_in):
+        def body():
+            new_unitary = torch.einsum(subs, self.curr_unitary_op, gate_in)
+            self.curr_unitary_op.copy_(new_unitary)
+            diff = self.curr_unitary_op - self.target_unitary_op
+            self._win_out.copy_(
+                torch.sum(diff.real ** 2 + diff.imag ** 2) < self.tol ** 2
+            )
+
+        # Warm up on a side stream before capturing, as required by the CUDA
+        # graphs API
+        stream = torch.cuda.Stream(device=self.device)
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            body()
+        torch.cuda.current_stream().wait_stream(stream)
+        self.curr_unitary_op.copy_(self.init_unitary_op)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            body()
+        self.curr_unitary_op.copy_(self.init_unitary_op)
+        return graph
+
+    def step(self, action_idx):
+        self.nb_steps += 1
+        _, (_, qbits) = self.full_action_list[action_idx]
+        if self._graphs_1q is not None:
+            if action_idx < self.nb_1q_actions:
+                self._gate_in_1q.copy_(self._gate_tensors[action_idx])
+                self._graphs_1q[qbits].replay()
+            else:
+                self._gate_in_2q.copy_(self._gate_tensors[action_idx])
+                self._graphs_2q[qbits].replay()
+        else:
+            if action_idx < self.nb_1q_actions:
+                subs = self._subs_1q[qbits]
+            else:
+                subs = self._subs_2q[qbits]
+            new_unitary, won_out = _torch_step_fn(
+                self.curr_unitary_op,
+                self._gate_tensors[action_idx],
+                self.target_unitary_op,
+                subs,
+                self.tol ** 2,
+            )
+            self.curr_unitary_op.copy_(new_unitary)
+            self._win_out.copy_(won_out)
+
+        won = bool(self._win_out.item())
+        done = won or self.nb_steps > self.max_steps
+        reward = self.final_reward if won else 0
+        return self.get_observation(), reward, done
+
+    def get_observation(self):
+        unitary = self.curr_unitary_op.permute(self._obs_axes).reshape(
+            2 ** self.nb_qbits, 2 ** self.nb_qbits
+        )
+        return torch.stack((unitary.real, unitary.imag)).cpu().numpy()
+
+    def legal_actions(self):
+        return self._legal_actions_cached
+
+    def have_winner(self):
+        return bool(self._win_out.item())
+
+    def reset(self):
+        self.curr_unitary_op.copy_(self.init_unitary_op)
+        self._win_out.zero_()
+        self.nb_steps = 0
+        return self.get_observation()
+
+    def render(self):
+        observation = self.get_observation()
+        print("Current unitary (real part):")
+        print(observation[0])
+        print("Current unitary (imaginary part):")
+        print(observation[1])